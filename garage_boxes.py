@@ -1,19 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
 import io
-import json
+import logging
 import os
+import re
+import threading
 import uuid
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import meta
 from PIL import Image, ImageDraw, ImageFont
 import qrcode
+import qrcode.image.pure
 
 # ----------------------------- Config & paths ------------------------------
 load_dotenv()  # load .env into os.environ
@@ -27,10 +36,13 @@ for p in (DATA_DIR, TEMPLATES_DIR, STATIC_DIR):
 
 DATA_FILE = DATA_DIR / "boxes_sample.json"
 
+log = logging.getLogger("garage_boxes")
+
 # Settings from environment (strings by default)
 BASE_URL = os.getenv("BASE_URL").rstrip("/")
 ADMIN_PIN = os.getenv("ADMIN_PIN")  # optional; empty means no PIN required
 PORT = int(os.getenv("PORT"))
+MAX_IMPORT_BYTES = int(os.getenv("MAX_IMPORT_BYTES", 10 * 1024 * 1024))  # /import upload cap
 
 # ----------------------------- Data layer ----------------------------------
 # Structure:
@@ -41,23 +53,147 @@ PORT = int(os.getenv("PORT"))
 # }
 EMPTY = {"boxes": []}
 
+# Parsed copy of DATA_FILE, reused until the file's mtime changes (e.g. it was edited by hand).
+# Only one process may serve a given data file.
+# "index" maps box id -> box dict for the cached data; routes that add/remove boxes keep it in sync.
+# "gen" counts changes to the cached data in this process (see data_etag).
+_CACHE: Dict[str, Any] = {"mtime": 0, "data": None, "index": {}, "gen": 0}
+_BOOT = uuid.uuid4().hex[:8]
+
+def _cache_put(mtime: int, d: Dict[str, Any]) -> None:
+    if d is not _CACHE["data"]:
+        _CACHE["index"] = {b["id"]: b for b in d["boxes"]}
+    _CACHE["mtime"], _CACHE["data"] = mtime, d
+    _CACHE["gen"] += 1
+
+def data_etag() -> str:
+    # Changes whenever the cached data does. mtime alone lags behind unflushed saves, and
+    # _BOOT keeps a restarted process from reusing an ETag for different content.
+    return f'W/"{_BOOT}-{_CACHE["mtime"]:x}-{_CACHE["gen"]}"'
+
+# Saves only mark the cache dirty; a background task writes it out at most every FLUSH_INTERVAL
+# seconds (fsync'd tempfile + os.replace, so even a power cut leaves the old or the new DATA_FILE,
+# never a half-written one). If a write fails, _flush_error holds the exception until one succeeds.
+# _dirty stays set until the new file is in place, so nothing rereads the file mid-flush.
+# _cache_lock guards _dirty together with _CACHE; it is only held for in-memory updates.
+FLUSH_INTERVAL = 0.05
+_dirty = False
+_flush_error: Optional[Exception] = None
+_flush_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+def _cached_data() -> Optional[Dict[str, Any]]:
+    # The cached data if it is still current, else None (a single stat, safe to call on the event loop)
+    if _dirty:
+        return _CACHE["data"]  # in-memory copy is newer than the file
+    try:
+        mtime = DATA_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _CACHE["data"] if mtime == _CACHE["mtime"] else None
+
 def load_data() -> Dict[str, Any]:
+    d = _cached_data()
+    if d is not None:
+        return d
+    seen = (_CACHE["mtime"], _CACHE["gen"])
     if not DATA_FILE.exists():
-        DATA_FILE.write_text(json.dumps(EMPTY, indent=2), encoding="utf-8")
-    return json.loads(DATA_FILE.read_text(encoding="utf-8"))
+        DATA_FILE.write_bytes(orjson.dumps(EMPTY, option=orjson.OPT_INDENT_2))
+    st = DATA_FILE.stat()
+    d = orjson.loads(DATA_FILE.read_bytes())
+    with _cache_lock:
+        # Another load or a save may have replaced the cache while we parsed (this can run on a
+        # worker thread); never let this file read overwrite that, least of all unflushed saves.
+        if _dirty or (_CACHE["mtime"], _CACHE["gen"]) != seen:
+            return _CACHE["data"]
+        _cache_put(st.st_mtime_ns, d)
+    return d
+
+async def aload_data() -> Dict[str, Any]:
+    # load_data() for async routes: re-reading the file happens on a worker thread
+    d = _cached_data()
+    return d if d is not None else await asyncio.to_thread(load_data)
 
 def save_data(d: Dict[str, Any]) -> None:
-    DATA_FILE.write_text(json.dumps(d, indent=2), encoding="utf-8")
+    global _dirty
+    with _cache_lock:
+        _cache_put(_CACHE["mtime"], d)
+        _dirty = True
+    if _flush_error is not None:
+        # writes are failing: don't report the save as done unless it actually reaches disk
+        try:
+            flush_data()
+        except Exception as e:
+            raise HTTPException(503, f"Could not write data file ({e}); the change is kept in memory and retried")
+
+def flush_data() -> None:
+    global _dirty, _flush_error
+    with _flush_lock:
+        if not _dirty:
+            return
+        gen = _CACHE["gen"]
+        tmp = DATA_FILE.with_suffix(".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps(_CACHE["data"], option=orjson.OPT_INDENT_2))
+                f.flush()
+                os.fsync(f.fileno())
+                mtime = os.fstat(f.fileno()).st_mtime_ns
+            # rename keeps the mtime, so the cache matches the new file the moment it appears
+            _CACHE["mtime"] = mtime
+            os.replace(tmp, DATA_FILE)
+        except Exception as e:
+            _flush_error = e
+            tmp.unlink(missing_ok=True)
+            raise
+        _flush_error = None
+        with _cache_lock:
+            _dirty = _CACHE["gen"] != gen  # a save landed during the write: flush again
+
+def box_index(d: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    # d is always the object returned by (a)load_data(), so the cached index belongs to it
+    return _CACHE["index"]
 
 def find_box(d: Dict[str, Any], bid: str) -> Optional[Dict[str, Any]]:
-    return next((b for b in d["boxes"] if b["id"] == bid), None)
+    return box_index(d).get(bid)
 
 # ----------------------------- App setup -----------------------------------
-app = FastAPI(title="QR Box Inventory")
+app = FastAPI(title="QR Box Inventory", default_response_class=ORJSONResponse)
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
 
+async def _flush_loop() -> None:
+    failing = False
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        if not _dirty:
+            continue
+        try:
+            await asyncio.to_thread(flush_data)
+        except Exception:
+            if not failing:  # log once per outage, not every interval
+                log.exception("Writing %s failed; retrying", DATA_FILE)
+            failing = True
+        else:
+            if failing:
+                log.warning("Writing %s works again", DATA_FILE)
+            failing = False
+
+@app.on_event("startup")
+async def start_flusher() -> None:
+    app.state.flusher = asyncio.create_task(_flush_loop())
+
+@app.on_event("shutdown")
+async def stop_flusher() -> None:
+    app.state.flusher.cancel()
+    try:
+        flush_data()
+    except Exception:
+        log.exception("Final write of %s failed; unsaved changes are lost", DATA_FILE)
+
 # ----------------------------- Template seeding ----------------------------
+TEMPLATE_NAMES = ("layout.html", "index.html", "box_public.html", "box_admin.html", "labels.html")
+
 def seed(name: str, content: str) -> None:
     path = TEMPLATES_DIR / name
     if not path.exists():
@@ -249,7 +385,7 @@ seed("labels.html", """
 <div style="display:grid;grid-template-columns:repeat(auto-fill, minmax(220px,1fr));gap:16px">
   {% for b in boxes %}
     <div style="border:1px solid #eee;border-radius:12px;padding:10px;break-inside:avoid">
-      <img src="/qr/{{ b.id }}.png?style=label" alt="qr" style="width:100%">
+      <img src="{{ qr_uris[b.id] }}" alt="qr" style="width:100%">
       <div style="text-align:center;margin-top:6px;font-weight:600">{{ b.name }}</div>
     </div>
   {% endfor %}
@@ -257,6 +393,23 @@ seed("labels.html", """
 {% endblock %}
 """)
 
+_LABELS_INLINE: Optional[bool] = None
+
+def labels_inline() -> bool:
+    # A labels.html seeded before inline labels links /qr/<id>.png itself and ignores qr_uris
+    global _LABELS_INLINE
+    if _LABELS_INLINE is None:
+        src = templates.env.loader.get_source(templates.env, "labels.html")[0]
+        _LABELS_INLINE = "qr_uris" in meta.find_undeclared_variables(templates.env.parse(src))
+    return _LABELS_INLINE
+
+@app.on_event("startup")
+async def warm_templates() -> None:
+    # compile every template into the Jinja env cache before the first request
+    for name in TEMPLATE_NAMES:
+        templates.env.get_template(name)
+    labels_inline()
+
 # ----------------------------- Helpers -------------------------------------
 FONT = ImageFont.load_default()
 
@@ -266,68 +419,132 @@ def make_qr_square(url: str, scale: int = 4) -> Image.Image:
     qr.make(fit=True)
     return qr.make_image(fill_color="black", back_color="white").convert("L")
 
-def make_label_2x1(name: str, url: str) -> Image.Image:
+def qr_to_png_bytes(url: str, scale: int = 4) -> bytes:
+    # 1-bit PNG written straight from the QR matrix rows; no PIL image in between
+    qr = qrcode.QRCode(border=1, box_size=scale)
+    qr.add_data(url)
+    qr.make(fit=True)
+    buf = io.BytesIO()
+    qr.make_image(image_factory=qrcode.image.pure.PyPNGImage).save(buf)
+    return buf.getvalue()
+
+def make_label_2x1(name: str, url: str) -> bytes:
     img = Image.new("L", (384, 192), 255)
     qr_size = 176
-    qr = make_qr_square(url, scale=4).resize((qr_size, qr_size))
+    qr = make_qr_square(url, scale=4).resize((qr_size, qr_size), Image.Resampling.NEAREST)  # QR is binary; no smoothing needed
     x = (img.width  - qr_size) // 2
     y = (img.height - qr_size) // 2
     img.paste(qr, (x, y))
     # ImageDraw.Draw(img).text((200, 60), name[:22], font=FONT, fill=0)
-    return img
+    buf = io.BytesIO()
+    # low zlib effort: ~5x faster to encode, output only a few percent larger for a mostly-flat label
+    img.save(buf, format="PNG", optimize=False, compress_level=1)
+    return buf.getvalue()
+
+# Square QRs are drawn at size // 40 px per module, clamped to this range (roughly 80-1000 px)
+QR_SCALES = (2, 25)
+
+def qr_scale(size: int) -> int:
+    return min(max(size // 40, QR_SCALES[0]), QR_SCALES[1])
+
+def _render_png(bid: str, name: str, style: str, scale: int) -> bytes:
+    url = f"{BASE_URL}/b/{bid}"
+    if style == "qr":
+        return qr_to_png_bytes(url, scale=scale)
+    return make_label_2x1(name, url)
+
+# LRU of (PNG bytes, ETag) keyed by _render_png's arguments; name is part of the key so renaming
+# a box naturally misses. Only touched from the event loop, so no locking.
+PNG_CACHE_SIZE = 512
+_PNG_CACHE: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+
+async def render_png(bid: str, name: str, style: str, scale: int) -> Tuple[bytes, str]:
+    key = (bid, name, style, scale)
+    hit = _PNG_CACHE.get(key)
+    if hit is not None:
+        _PNG_CACHE.move_to_end(key)
+        return hit
+    # Pillow/zlib release the GIL for the heavy parts, so a worker thread keeps the loop free
+    png = await asyncio.to_thread(_render_png, *key)
+    hit = _PNG_CACHE[key] = (png, f'"{hashlib.sha1(png).hexdigest()}"')
+    if len(_PNG_CACHE) > PNG_CACHE_SIZE:
+        _PNG_CACHE.popitem(last=False)
+    return hit
+
+# Upper bound for any item qty; orjson can only write integers that fit in 64 bits
+MAX_QTY = 10**9
+
+# Item lines of the add-box textarea, tried in order:
+#   1. a comma: name is everything before the last one, qty the rest if it's a number (else 1)
+#   2. "Name x Qty" / "Name × Qty"
+#   3. just "Name"
+# Lines are joined with plain \n first; [^\S\n] is then any other whitespace (the characters
+# str.strip() removes, e.g. a pasted \xa0 or \u3000), so a match never runs across lines.
+_ITEMS_RE = re.compile(
+    r"^(.*),[^\S\n]*(?:(\d+)[^\S\n]*|.*)$"
+    r"|^[^\S\n]*(\S.*?)[x×][^\S\n]*(\d+)[^\S\n]*$"
+    r"|^[^\S\n]*(\S.*?)[^\S\n]*$",
+    re.MULTILINE | re.IGNORECASE,
+)
+
+def _item_qty(digits: Optional[str]) -> int:
+    # A qty int() refuses (over ~4300 digits) counts as 1, as a non-numeric one after a comma always has
+    if not digits:
+        return 1
+    try:
+        return min(int(digits), MAX_QTY)
+    except ValueError:
+        return 1
 
 def require_pin(pin: Optional[str]) -> None:
     if ADMIN_PIN and pin != ADMIN_PIN:
         raise HTTPException(status_code=403, detail="Invalid PIN")
 
+def not_modified(r: Request, etag: str) -> bool:
+    inm = r.headers.get("if-none-match")
+    return bool(inm) and etag in (t.strip() for t in inm.split(","))
+
+# Rendered page bodies by template name, reused while data_etag() is unchanged
+_PAGES: Dict[str, Tuple[str, bytes]] = {}
+
+def cached_page(name: str, etag: str) -> Optional[bytes]:
+    hit = _PAGES.get(name)
+    return hit[1] if hit and hit[0] == etag else None
+
+def render_page(name: str, etag: str, **context: Any) -> bytes:
+    # plain Template.render: the pages never use the request, so skip TemplateResponse
+    body = templates.get_template(name).render(**context).encode()
+    _PAGES[name] = (etag, body)
+    return body
+
 # ----------------------------- Routes --------------------------------------
 @app.get("/", response_class=HTMLResponse)
-def home(r: Request):
-    d = load_data()
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": r, "boxes": d["boxes"], "pin_required": bool(ADMIN_PIN)}
+async def home(r: Request):
+    d = await aload_data()
+    etag = data_etag()
+    if not_modified(r, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    body = cached_page("index.html", etag) or render_page(
+        "index.html", etag, boxes=d["boxes"], pin_required=bool(ADMIN_PIN)
     )
-
-from typing import Optional
-import re
+    return HTMLResponse(body, headers={"ETag": etag, "Cache-Control": "no-cache", "Content-Length": str(len(body))})
 
 @app.post("/boxes")
-def add_box(
+async def add_box(
     name: str = Form(...),
     location: str = Form(""),
     items: str = Form(""),                 
     pin: Optional[str] = Form(None)
 ):
     require_pin(pin)
-    d = load_data()
+    d = await aload_data()
 
     # Parse "items" textarea: supports "Name,Qty" or "Name x Qty" (× also ok)
-    parsed_items = []
-    for line in items.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        qty = 1
-        name_part = line
-
-        # Try "name,qty"
-        if "," in line:
-            left, right = line.rsplit(",", 1)
-            name_part = left.strip()
-            try:
-                qty = int(right.strip())
-            except ValueError:
-                qty = 1
-        else:
-            # Try "name x qty" or "name × qty"
-            m = re.search(r"(.+?)[x×]\s*(\d+)$", line, flags=re.IGNORECASE)
-            if m:
-                name_part = m.group(1).strip()
-                qty = int(m.group(2))
-
-        if name_part:
-            parsed_items.append({"name": name_part, "qty": qty})
+    parsed_items = [
+        {"name": name_part, "qty": _item_qty(m.group(2) or m.group(4))}
+        for m in _ITEMS_RE.finditer("\n".join(items.splitlines()))  # every line break -> \n
+        if (name_part := (m.group(1) or m.group(3) or m.group(5) or "").strip())
+    ]
 
     b = {
         "id": uuid.uuid4().hex,
@@ -336,21 +553,22 @@ def add_box(
         "items": parsed_items,             
     }
     d["boxes"].insert(0, b)
+    box_index(d)[b["id"]] = b
     save_data(d)
     return RedirectResponse("/", status_code=303)
 
 
 @app.get("/b/{bid}", response_class=HTMLResponse)
-def box_public(bid: str, r: Request):
-    d = load_data()
+async def box_public(bid: str, r: Request):
+    d = await aload_data()
     b = find_box(d, bid)
     if not b:
         raise HTTPException(404)
     return templates.TemplateResponse("box_public.html", {"request": r, "box": b})
 
 @app.get("/boxes/{bid}", response_class=HTMLResponse)
-def box_admin(bid: str, r: Request):
-    d = load_data()
+async def box_admin(bid: str, r: Request):
+    d = await aload_data()
     b = find_box(d, bid)
     if not b:
         raise HTTPException(404)
@@ -360,14 +578,14 @@ def box_admin(bid: str, r: Request):
     )
 
 @app.post("/items")
-def add_item(
+async def add_item(
     box_id: str = Form(...),
     name: str = Form(...),
-    qty: int = Form(1),
+    qty: int = Form(1, ge=1, le=MAX_QTY),
     pin: Optional[str] = Form(None)
 ):
     require_pin(pin)
-    d = load_data()
+    d = await aload_data()
     b = find_box(d, box_id)
     if not b:
         raise HTTPException(404)
@@ -376,55 +594,93 @@ def add_item(
     return RedirectResponse(f"/boxes/{box_id}", status_code=303)
 
 @app.get("/labels", response_class=HTMLResponse)
-def labels(r: Request):
-    d = load_data()
-    return templates.TemplateResponse("labels.html", {"request": r, "boxes": d["boxes"]})
+async def labels(r: Request):
+    d = await aload_data()
+    etag = data_etag()
+    if not_modified(r, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    body = cached_page("labels.html", etag)
+    if body is None:
+        # inline every label so the print sheet is one response instead of one request per box;
+        # snapshot the list since a box may be added while the renders are awaited
+        boxes = list(d["boxes"])
+        qr_uris = {}
+        if labels_inline():
+            pngs = await asyncio.gather(*(render_png(b["id"], b.get("name", ""), "label", 0) for b in boxes))
+            qr_uris = {b["id"]: "data:image/png;base64," + base64.b64encode(png).decode() for b, (png, _) in zip(boxes, pngs)}
+        body = render_page("labels.html", etag, boxes=boxes, qr_uris=qr_uris)
+    headers["Content-Length"] = str(len(body))
+    return HTMLResponse(body, headers=headers)
 
 @app.get("/qr/{bid}.png")
-def qr_png(bid: str, style: str = "label", size: int = 200):
-    d = load_data()
+async def qr_png(bid: str, r: Request, style: str = "label", size: int = 200):
+    d = await aload_data()
     b = find_box(d, bid)
     if not b:
         raise HTTPException(404)
-    url = f"{BASE_URL}/b/{bid}"
-
     if style == "qr":
-        img = make_qr_square(url, scale=max(2, size // 40))
+        # the square QR encodes only the URL, so neither the name nor the exact size is in the key
+        png, etag = await render_png(bid, "", "qr", qr_scale(size))
     else:
-        img = make_label_2x1(b["name"], url)
-
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return Response(content=buf.getvalue(), media_type="image/png")
+        png, etag = await render_png(bid, b.get("name", ""), "label", 0)  # labels have a fixed size
+    headers = {"ETag": etag}
+    if style == "qr":
+        headers["Cache-Control"] = "public, max-age=3600, immutable"  # encodes only the box URL
+    else:
+        headers["Cache-Control"] = "no-cache"  # label depends on the (editable) box name
+    if not_modified(r, etag):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Length"] = str(len(png))  # cached bytes go out as-is; spare Starlette the len()
+    return Response(content=png, media_type="image/png", headers=headers)
 
 @app.get("/export")
-def export_json():
-    content = DATA_FILE.read_bytes() if DATA_FILE.exists() else json.dumps(EMPTY).encode()
-    return StreamingResponse(
-        io.BytesIO(content),
-        media_type="application/json",
-        headers={"Content-Disposition": 'attachment; filename="boxes.json"'}
-    )
+async def export_json():
+    await asyncio.to_thread(flush_data)
+    if not DATA_FILE.exists():
+        return Response(
+            orjson.dumps(EMPTY),
+            media_type="application/json",
+            headers={"Content-Disposition": 'attachment; filename="boxes.json"'}
+        )
+    # served with sendfile straight from the page cache
+    return FileResponse(DATA_FILE, media_type="application/json", filename="boxes.json")
 
 @app.post("/import")
-def import_json(file: UploadFile = File(...), pin: Optional[str] = Form(None)):
+async def import_json(file: UploadFile = File(...), pin: Optional[str] = Form(None)):
     require_pin(pin)
-    payload = json.loads(file.file.read().decode("utf-8"))
-    if "boxes" not in payload or not isinstance(payload["boxes"], list):
+    raw = await file.read(MAX_IMPORT_BYTES + 1)
+    if len(raw) > MAX_IMPORT_BYTES:
+        raise HTTPException(413, f"Import too large (max {MAX_IMPORT_BYTES} bytes)")
+    try:
+        payload = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        raise HTTPException(400, "Invalid JSON")
+    if not isinstance(payload, dict) or not isinstance(payload.get("boxes"), list):
         raise HTTPException(400, "Invalid JSON (expected {'boxes': [...]})")
+    for bx in payload["boxes"]:
+        if not isinstance(bx, dict) or not isinstance(bx.get("id"), str):
+            raise HTTPException(400, "Invalid JSON (every box needs a string 'id')")
+        items = bx.get("items") or []
+        if not isinstance(items, list):
+            raise HTTPException(400, "Invalid JSON (box 'items' must be a list)")
+        for it in items:
+            q = it.get("qty") if isinstance(it, dict) else None
+            if isinstance(q, (int, float)) and abs(q) > MAX_QTY:
+                raise HTTPException(400, f"Invalid JSON (item qty must be within ±{MAX_QTY})")
     save_data(payload)
     return RedirectResponse("/", status_code=303)
 
 
 @app.post("/boxes/update")
-def update_box(
+async def update_box(
     box_id: str = Form(...),
     name: str = Form(...),
     location: str = Form(""),
     pin: Optional[str] = Form(None)
 ):
     require_pin(pin)
-    d = load_data()
+    d = await aload_data()
     b = find_box(d, box_id)
     if not b:
         raise HTTPException(404)
@@ -435,7 +691,7 @@ def update_box(
 
 # --- Permanently delete a box ---
 @app.post("/boxes/delete")
-def delete_box(
+async def delete_box(
     box_id: str = Form(...),
     confirm: str = Form(...),      # must be "DELETE"
     pin: Optional[str] = Form(None)
@@ -443,44 +699,44 @@ def delete_box(
     require_pin(pin)
     if confirm.strip().upper() != "DELETE":
         raise HTTPException(400, 'Type "DELETE" to confirm')
-    d = load_data()
-    before = len(d["boxes"])
-    d["boxes"] = [bx for bx in d["boxes"] if bx["id"] != box_id]
-    if len(d["boxes"]) == before:
+    d = await aload_data()
+    b = box_index(d).pop(box_id, None)
+    if not b:
         raise HTTPException(404)
+    d["boxes"].remove(b)
     save_data(d)
     return RedirectResponse("/", status_code=303)
 
 # --- Update an item (by index) ---
 @app.post("/items/update")
-def update_item(
+async def update_item(
     box_id: str = Form(...),
     idx: int = Form(...),
     name: str = Form(...),
-    qty: int = Form(...),
+    qty: int = Form(..., ge=1, le=MAX_QTY),
     pin: Optional[str] = Form(None)
 ):
     require_pin(pin)
-    d = load_data()
+    d = await aload_data()
     b = find_box(d, box_id)
     if not b:
         raise HTTPException(404)
     items = b.setdefault("items", [])
     if idx < 0 or idx >= len(items):
         raise HTTPException(400, "Invalid item index")
-    items[idx] = {"name": name.strip(), "qty": max(1, int(qty))}
+    items[idx] = {"name": name.strip(), "qty": int(qty)}
     save_data(d)
     return RedirectResponse(f"/boxes/{box_id}", status_code=303)
 
 # --- Delete an item (by index) ---
 @app.post("/items/delete")
-def delete_item(
+async def delete_item(
     box_id: str = Form(...),
     idx: int = Form(...),
     pin: Optional[str] = Form(None)
 ):
     require_pin(pin)
-    d = load_data()
+    d = await aload_data()
     b = find_box(d, box_id)
     if not b:
         raise HTTPException(404)
@@ -505,4 +761,7 @@ if __name__ == "__main__":
             With localhost, they work on this device only.
     -----------------------------------------
     """))
-    uvicorn.run("garage_boxes:app", host="0.0.0.0", port=PORT)
+    # loop/http "auto" already pick uvloop + httptools (both in requirements.txt) and fall back
+    # cleanly where they can't be installed (Windows). One worker on purpose: saves are
+    # write-behind from this process's in-memory copy, so a second worker would overwrite them.
+    uvicorn.run("garage_boxes:app", host="0.0.0.0", port=PORT, access_log=False)